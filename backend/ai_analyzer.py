@@ -1,12 +1,73 @@
 import json
 import requests
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 import time
+from concurrent.futures import ThreadPoolExecutor
+from resume_parser import analyze_resume_structure, extract_candidate_history, get_degree_rank
+from utils import extract_job_requirements
 
 # Free API configurations - using Google Gemini API (free tier)
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', 'your-gemini-api-key-here')
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
+GEMINI_API_URL = os.getenv(
+    'GEMINI_API_URL',
+    "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
+)
+HF_API_URL = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-medium"
+API_TIMEOUT_SECONDS = 30
+DEFAULT_OUTPUT_TOKENS = 2048        # output budget API_TIMEOUT_SECONDS is sized for
+
+# Optional async HTTP client for the ASGI serving mode (see asgi.py)
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+_async_client = None
+
+# Prompt building blocks shared by single and batched analysis prompts
+ANALYSIS_ROLE = "You are a professional ATS (Applicant Tracking System) and resume analysis expert. "
+
+ANALYSIS_JSON_EXAMPLE = """{
+    "match_score": 85,
+    "matched_skills": ["React", "JavaScript", "Python", "CSS"],
+    "missing_skills": ["Node.js", "AWS", "Docker", "MongoDB"],
+    "matched_keywords": ["frontend", "responsive design", "API integration"],
+    "missing_keywords": ["backend", "cloud deployment", "database design"],
+    "suggestions": [
+        "Add a professional summary at the beginning",
+        "Include backend development experience",
+        "Highlight cloud computing skills",
+        "Quantify achievements in the experience section"
+    ],
+    "strengths": [
+        "Strong frontend development experience", 
+        "Good project portfolio",
+        "Relevant educational background"
+    ],
+    "weaknesses": [
+        "Limited backend experience",
+        "Missing cloud platform knowledge",
+        "No mention of testing frameworks"
+    ],
+    "overall_assessment": "Strong candidate with solid frontend skills but lacks some backend requirements. Recommended for interview with focus on technical growth areas.",
+    "recommendation": "CONSIDER"
+}"""
+
+# Batch screening limits
+BATCH_PROMPT_TOKEN_BUDGET = 24000   # estimated input tokens per packed request
+BATCH_MAX_RESUMES = 8
+BATCH_OUTPUT_TOKENS_PER_RESUME = 700
+BATCH_CONCURRENCY = 4               # packed requests sent at the same time
+MAX_OUTPUT_TOKENS = 8192            # gemini-1.5-flash output ceiling
+CHARS_PER_TOKEN = 4                 # rough estimate for English text
+
+ANALYSIS_INSTRUCTIONS = """Instructions:
+1. Match score should be 0-100 based on overall fit
+2. List specific skills found vs required
+3. Provide actionable improvement suggestions
+4. Give overall assessment and recommendation (STRONG_FIT, CONSIDER, WEAK_FIT)
+5. Return ONLY valid JSON, no other text"""
 
 def analyze_resume(resume_text: str, job_description: str) -> Dict[str, Any]:
     """
@@ -22,18 +83,135 @@ def analyze_resume(resume_text: str, job_description: str) -> Dict[str, Any]:
         # Parse and structure the result
         structured_result = parse_analysis_result(analysis_result)
 
-        return structured_result
+        return apply_local_analysis(structured_result, resume_text, job_description)
 
     except Exception as e:
         print(f"AI Analysis error: {str(e)}")
         # Return fallback analysis
         return create_fallback_analysis(resume_text, job_description)
 
+def apply_local_analysis(result: Dict[str, Any], resume_text: str, job_description: str) -> Dict[str, Any]:
+    """Fill the fields that are computed deterministically instead of by the AI"""
+
+    # Section, layout, experience and education checks are deterministic, so they are computed locally
+    structure = analyze_resume_structure(resume_text)
+    result['missing_sections'] = structure['missing_sections']
+    result['ats_issues'] = structure['ats_issues']
+    result.update(compute_experience_education_match(resume_text, job_description))
+
+    return result
+
+def analyze_resumes_batch(resume_texts: List[str], job_description: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Analyze several resumes against one job description with packed AI requests.
+
+    Returns the analyses in input order and statistics comparing the calls and
+    estimated prompt tokens used with one request per resume.
+    """
+
+    results = [None] * len(resume_texts)
+    stats = {
+        "resumes": len(resume_texts),
+        "api_calls": 0,
+        "unbatched_api_calls": len(resume_texts),
+        "prompt_tokens": 0,
+        "unbatched_prompt_tokens": sum(
+            estimate_tokens(create_analysis_prompt(text, job_description)) for text in resume_texts
+        ),
+        "batches": 0,
+        "retried_items": 0
+    }
+
+    def analyze_single(index):
+        return analyze_resume(resume_texts[index], job_description)
+
+    def analyze_packed(indexes):
+        prompt = create_batch_analysis_prompt([resume_texts[i] for i in indexes], job_description)
+        max_output_tokens = min(MAX_OUTPUT_TOKENS, BATCH_OUTPUT_TOKENS_PER_RESUME * len(indexes))
+        try:
+            return parse_batch_analysis_result(
+                call_gemini_api(prompt, max_output_tokens=max_output_tokens), len(indexes)
+            )
+        except Exception as e:
+            print(f"Batch analysis error, retrying {len(indexes)} resumes individually: {str(e)}")
+            return [None] * len(indexes)
+
+    batches = pack_resume_batches(resume_texts, job_description)
+    packed = [indexes for indexes in batches if len(indexes) > 1]
+    single = [indexes[0] for indexes in batches if len(indexes) == 1]
+
+    stats["batches"] = len(batches)
+    stats["api_calls"] = len(batches)
+    stats["prompt_tokens"] = sum(
+        estimate_tokens(create_batch_analysis_prompt([resume_texts[i] for i in indexes], job_description))
+        for indexes in packed
+    ) + sum(estimate_tokens(create_analysis_prompt(resume_texts[i], job_description)) for i in single)
+
+    # Packed requests are independent, so they run side by side rather than back to back
+    with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as pool:
+        single_results = pool.map(analyze_single, single)
+        packed_results = list(pool.map(analyze_packed, packed))
+
+        for index, result in zip(single, single_results):
+            results[index] = result
+
+        retry = []
+        for indexes, batch_results in zip(packed, packed_results):
+            for index, result in zip(indexes, batch_results):
+                if result is not None:
+                    results[index] = apply_local_analysis(result, resume_texts[index], job_description)
+                else:
+                    # Unparseable batch: retry each resume on its own
+                    retry.append(index)
+
+        stats["retried_items"] = len(retry)
+        stats["api_calls"] += len(retry)
+        stats["prompt_tokens"] += sum(
+            estimate_tokens(create_analysis_prompt(resume_texts[i], job_description)) for i in retry
+        )
+        for index, result in zip(retry, pool.map(analyze_single, retry)):
+            results[index] = result
+
+    stats["api_calls_saved"] = stats["unbatched_api_calls"] - stats["api_calls"]
+    stats["prompt_tokens_per_resume"] = round(stats["prompt_tokens"] / max(len(resume_texts), 1))
+    stats["unbatched_prompt_tokens_per_resume"] = round(stats["unbatched_prompt_tokens"] / max(len(resume_texts), 1))
+
+    return results, stats
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a prompt"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def pack_resume_batches(resume_texts: List[str], job_description: str) -> List[List[int]]:
+    """Greedily group resume indexes so each packed prompt stays within the token budget"""
+
+    overhead = estimate_tokens(create_batch_analysis_prompt([], job_description))
+    batches = []
+    current = []
+    current_tokens = overhead
+
+    for index, text in enumerate(resume_texts):
+        # Per-resume header ("RESUME n TEXT:") plus separators
+        resume_tokens = estimate_tokens(text) + 8
+
+        if current and (current_tokens + resume_tokens > BATCH_PROMPT_TOKEN_BUDGET or len(current) >= BATCH_MAX_RESUMES):
+            batches.append(current)
+            current = []
+            current_tokens = overhead
+
+        current.append(index)
+        current_tokens += resume_tokens
+
+    if current:
+        batches.append(current)
+
+    return batches
+
 def create_analysis_prompt(resume_text: str, job_description: str) -> str:
     """Create a structured prompt for AI analysis"""
 
     prompt = f"""
-You are a professional ATS (Applicant Tracking System) and resume analysis expert. 
+{ANALYSIS_ROLE}
 Analyze the following resume against the job description and provide a comprehensive analysis.
 
 RESUME TEXT:
@@ -43,95 +221,184 @@ JOB DESCRIPTION:
 {job_description}
 
 Please analyze and return ONLY a valid JSON response with the following structure:
-{{
-    "match_score": 85,
-    "matched_skills": ["React", "JavaScript", "Python", "CSS"],
-    "missing_skills": ["Node.js", "AWS", "Docker", "MongoDB"],
-    "matched_keywords": ["frontend", "responsive design", "API integration"],
-    "missing_keywords": ["backend", "cloud deployment", "database design"],
-    "experience_match": {{
-        "required_years": 3,
-        "candidate_years": 2,
-        "match_percentage": 67
-    }},
-    "education_match": {{
-        "required": "Bachelor's in Computer Science",
-        "candidate": "Bachelor's in Information Technology",
-        "match": true
-    }},
-    "missing_sections": ["Summary", "Certifications"],
-    "ats_issues": ["Tables detected", "Non-standard fonts used"],
-    "suggestions": [
-        "Add a professional summary at the beginning",
-        "Include backend development experience",
-        "Highlight cloud computing skills",
-        "Remove tables and use simple text formatting",
-        "Add relevant certifications section"
-    ],
-    "strengths": [
-        "Strong frontend development experience", 
-        "Good project portfolio",
-        "Relevant educational background"
-    ],
-    "weaknesses": [
-        "Limited backend experience",
-        "Missing cloud platform knowledge",
-        "No mention of testing frameworks"
-    ],
-    "overall_assessment": "Strong candidate with solid frontend skills but lacks some backend requirements. Recommended for interview with focus on technical growth areas.",
-    "recommendation": "CONSIDER"
-}}
+{ANALYSIS_JSON_EXAMPLE}
 
-Instructions:
-1. Match score should be 0-100 based on overall fit
-2. List specific skills found vs required
-3. Identify missing resume sections (Summary, Experience, Skills, Education, Projects, Certifications)
-4. Flag ATS issues (tables, images, complex formatting, unusual fonts)
-5. Provide actionable improvement suggestions
-6. Give overall assessment and recommendation (STRONG_FIT, CONSIDER, WEAK_FIT)
-7. Return ONLY valid JSON, no other text
+{ANALYSIS_INSTRUCTIONS}
 """
 
     return prompt
 
-def call_gemini_api(prompt: str) -> str:
-    """Call Google Gemini API for analysis"""
+def create_batch_analysis_prompt(resume_texts: List[str], job_description: str) -> str:
+    """Create one prompt that analyzes several resumes against a shared job description"""
 
-    try:
-        headers = {
-            'Content-Type': 'application/json',
-            'x-goog-api-key': GEMINI_API_KEY
+    resumes_block = "\n\n".join(
+        f"RESUME {index} TEXT:\n{text}" for index, text in enumerate(resume_texts, start=1)
+    )
+
+    prompt = f"""
+{ANALYSIS_ROLE}
+Analyze each of the following {len(resume_texts)} resumes independently against the same job description.
+
+JOB DESCRIPTION:
+{job_description}
+
+{resumes_block}
+
+Please analyze and return ONLY a valid JSON array with exactly {len(resume_texts)} objects, one per resume in the
+order given. Each object must include "resume_index" (1-{len(resume_texts)}) and follow this structure:
+{ANALYSIS_JSON_EXAMPLE}
+
+{ANALYSIS_INSTRUCTIONS}
+"""
+
+    return prompt
+
+def compute_experience_education_match(resume_text: str, job_description: str) -> Dict[str, Any]:
+    """Compare parsed resume experience and education with the job requirements"""
+
+    requirements = extract_job_requirements(job_description)
+    candidate_years, candidate_degree = extract_candidate_history(resume_text)
+    required_years = requirements['experience_years']
+    required_degree = requirements['education']
+
+    if required_years is None:
+        experience_percentage = 100 if candidate_years is not None else 50
+    elif candidate_years is None:
+        experience_percentage = 0
+    else:
+        experience_percentage = int(min(candidate_years / max(required_years, 1), 1) * 100)
+
+    if required_degree is None:
+        education_match = True
+    else:
+        education_match = get_degree_rank(candidate_degree) >= get_degree_rank(required_degree)
+
+    return {
+        "experience_match": {
+            "required_years": required_years if required_years is not None else "Not specified",
+            "candidate_years": candidate_years if candidate_years is not None else "Not determined",
+            "match_percentage": experience_percentage
+        },
+        "education_match": {
+            "required": required_degree or "Not specified",
+            "candidate": candidate_degree or "Not determined",
+            "match": education_match
         }
+    }
 
-        data = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }],
-            "generationConfig": {
-                "temperature": 0.3,
-                "topP": 0.8,
-                "maxOutputTokens": 2048
-            }
+def build_gemini_request(prompt: str, max_output_tokens: int = 2048) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Build headers and body for a Gemini generateContent request"""
+
+    headers = {
+        'Content-Type': 'application/json',
+        'x-goog-api-key': GEMINI_API_KEY
+    }
+
+    data = {
+        "contents": [{
+            "parts": [{
+                "text": prompt
+            }]
+        }],
+        "generationConfig": {
+            "temperature": 0.3,
+            "topP": 0.8,
+            "maxOutputTokens": max_output_tokens
         }
+    }
 
-        response = requests.post(GEMINI_API_URL, headers=headers, json=data, timeout=30)
+    return headers, data
 
-        if response.status_code == 200:
-            result = response.json()
-            if 'candidates' in result and len(result['candidates']) > 0:
-                return result['candidates'][0]['content']['parts'][0]['text']
-            else:
-                raise Exception("No response content from Gemini API")
+def extract_gemini_text(status_code: int, result: Any, response_text: str) -> str:
+    """Return the generated text from a Gemini response or raise"""
+
+    if status_code == 200:
+        if 'candidates' in result and len(result['candidates']) > 0:
+            return result['candidates'][0]['content']['parts'][0]['text']
         else:
-            print(f"Gemini API error: {response.status_code} - {response.text}")
-            raise Exception(f"API call failed with status {response.status_code}")
+            raise Exception("No response content from Gemini API")
+    else:
+        print(f"Gemini API error: {status_code} - {response_text}")
+        raise Exception(f"API call failed with status {status_code}")
+
+def get_api_timeout(max_output_tokens: int) -> float:
+    """Scale the read timeout with the output budget so long batched answers can finish"""
+    return API_TIMEOUT_SECONDS * max(1.0, max_output_tokens / DEFAULT_OUTPUT_TOKENS)
+
+def call_gemini_api(prompt: str, max_output_tokens: int = DEFAULT_OUTPUT_TOKENS) -> str:
+    """Call Google Gemini API for analysis"""
+
+    try:
+        headers, data = build_gemini_request(prompt, max_output_tokens)
+
+        response = requests.post(GEMINI_API_URL, headers=headers, json=data,
+                                 timeout=get_api_timeout(max_output_tokens))
+
+        result = response.json() if response.status_code == 200 else None
+        return extract_gemini_text(response.status_code, result, response.text)
+
+    except Exception as e:
+        print(f"Gemini API call failed: {str(e)}")
+        raise e
+
+def get_async_http_client():
+    """Return the shared async HTTP client, creating it on first use"""
+
+    global _async_client
+
+    if httpx is None:
+        raise Exception("httpx not installed. Async serving mode is unavailable.")
+
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=API_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+        )
+    return _async_client
+
+async def close_async_http_client() -> None:
+    """Close the shared async HTTP client (called on ASGI shutdown)"""
+
+    global _async_client
+
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+async def call_gemini_api_async(prompt: str, max_output_tokens: int = DEFAULT_OUTPUT_TOKENS) -> str:
+    """Call Google Gemini API without blocking the event loop"""
+
+    try:
+        headers, data = build_gemini_request(prompt, max_output_tokens)
+
+        response = await get_async_http_client().post(GEMINI_API_URL, headers=headers, json=data,
+                                                      timeout=get_api_timeout(max_output_tokens))
+
+        result = response.json() if response.status_code == 200 else None
+        return extract_gemini_text(response.status_code, result, response.text)
 
     except Exception as e:
         print(f"Gemini API call failed: {str(e)}")
         raise e
 
+async def analyze_resume_async(resume_text: str, job_description: str) -> Dict[str, Any]:
+    """
+    Async counterpart of analyze_resume for the ASGI serving mode
+    """
+    try:
+        prompt = create_analysis_prompt(resume_text, job_description)
+
+        analysis_result = await call_gemini_api_async(prompt)
+
+        structured_result = parse_analysis_result(analysis_result)
+
+        return apply_local_analysis(structured_result, resume_text, job_description)
+
+    except Exception as e:
+        print(f"AI Analysis error: {str(e)}")
+        # Return fallback analysis
+        return create_fallback_analysis(resume_text, job_description)
+
 def parse_analysis_result(api_response: str) -> Dict[str, Any]:
     """Parse and validate the AI response"""
 
@@ -148,12 +415,7 @@ def parse_analysis_result(api_response: str) -> Dict[str, Any]:
             result = json.loads(json_text)
 
             # Validate required fields
-            required_fields = ['match_score', 'matched_skills', 'missing_skills', 'suggestions']
-            for field in required_fields:
-                if field not in result:
-                    result[field] = get_default_value(field)
-
-            return result
+            return validate_analysis_fields(result)
         else:
             raise Exception("No valid JSON found in response")
 
@@ -162,6 +424,57 @@ def parse_analysis_result(api_response: str) -> Dict[str, Any]:
         print(f"Response text: {api_response}")
         raise Exception("Failed to parse AI response as JSON")
 
+def parse_batch_analysis_result(api_response: str, expected_count: int) -> List[Any]:
+    """
+    Parse a JSON array of analyses from a batched AI response.
+
+    Returns one analysis per resume in prompt order. The batch is accepted
+    only if every item carries an integer resume_index and the indexes are
+    exactly 1..expected_count; anything else raises so the caller retries
+    each resume on its own rather than risk pinning an analysis on the
+    wrong candidate.
+    """
+
+    response_text = api_response.strip()
+    start_idx = response_text.find('[')
+    end_idx = response_text.rfind(']') + 1
+
+    if start_idx == -1 or end_idx == 0:
+        raise Exception("No JSON array found in batch response")
+
+    try:
+        items = json.loads(response_text[start_idx:end_idx])
+    except json.JSONDecodeError as e:
+        print(f"Batch JSON parsing error: {str(e)}")
+        raise Exception("Failed to parse batch AI response as JSON")
+
+    if not isinstance(items, list):
+        raise Exception("Batch response is not a JSON array")
+
+    if not all(isinstance(item, dict) for item in items):
+        raise Exception("Batch response contains non-object items")
+
+    indexes = [item.get('resume_index') for item in items]
+    if (any(type(index) is not int for index in indexes) or
+            sorted(indexes) != list(range(1, expected_count + 1))):
+        raise Exception(f"Batch response indexes {indexes} do not match resumes 1..{expected_count}")
+
+    results = [None] * expected_count
+    for item in items:
+        results[item.pop('resume_index') - 1] = validate_analysis_fields(item)
+
+    return results
+
+def validate_analysis_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill required fields that the AI left out"""
+
+    required_fields = ['match_score', 'matched_skills', 'missing_skills', 'suggestions']
+    for field in required_fields:
+        if field not in result:
+            result[field] = get_default_value(field)
+
+    return result
+
 def get_default_value(field: str):
     """Get default values for missing fields"""
     defaults = {
@@ -199,6 +512,8 @@ def create_fallback_analysis(resume_text: str, job_description: str) -> Dict[str
         elif skill in job_lower and skill not in resume_lower:
             missing_skills.append(skill.title())
 
+    structure = analyze_resume_structure(resume_text)
+
     # Calculate basic match score
     total_job_skills = len([s for s in common_skills if s in job_lower])
     matched_count = len(matched_skills)
@@ -210,18 +525,9 @@ def create_fallback_analysis(resume_text: str, job_description: str) -> Dict[str
         "missing_skills": missing_skills[:10],  # Limit to 10
         "matched_keywords": [],
         "missing_keywords": [],
-        "experience_match": {
-            "required_years": "Not specified",
-            "candidate_years": "Not determined",
-            "match_percentage": 50
-        },
-        "education_match": {
-            "required": "Not specified",
-            "candidate": "Not determined",
-            "match": True
-        },
-        "missing_sections": [],
-        "ats_issues": ["Unable to perform detailed ATS analysis"],
+        **compute_experience_education_match(resume_text, job_description),
+        "missing_sections": structure['missing_sections'],
+        "ats_issues": structure['ats_issues'],
         "suggestions": [
             "Consider adding more relevant keywords from the job description",
             "Ensure your resume includes all your technical skills",
@@ -235,10 +541,9 @@ def create_fallback_analysis(resume_text: str, job_description: str) -> Dict[str
     }
 
 # Alternative: Using Hugging Face free API as backup
-def call_huggingface_api(prompt: str) -> str:
-    """Backup method using Hugging Face free API"""
+def build_huggingface_request(prompt: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Build headers and body for a Hugging Face inference request"""
 
-    HF_API_URL = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-medium"
     HF_TOKEN = os.getenv('HUGGINGFACE_TOKEN', '')
 
     if not HF_TOKEN:
@@ -257,7 +562,27 @@ def call_huggingface_api(prompt: str) -> str:
         }
     }
 
-    response = requests.post(HF_API_URL, headers=headers, json=data, timeout=30)
+    return headers, data
+
+def call_huggingface_api(prompt: str) -> str:
+    """Backup method using Hugging Face free API"""
+
+    headers, data = build_huggingface_request(prompt)
+
+    response = requests.post(HF_API_URL, headers=headers, json=data, timeout=API_TIMEOUT_SECONDS)
+
+    if response.status_code == 200:
+        result = response.json()
+        return result[0]['generated_text'] if result else ""
+    else:
+        raise Exception(f"Hugging Face API failed with status {response.status_code}")
+
+async def call_huggingface_api_async(prompt: str) -> str:
+    """Async backup method using Hugging Face free API"""
+
+    headers, data = build_huggingface_request(prompt)
+
+    response = await get_async_http_client().post(HF_API_URL, headers=headers, json=data)
 
     if response.status_code == 200:
         result = response.json()
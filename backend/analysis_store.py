@@ -0,0 +1,149 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Dict, Optional
+
+# Retention limits
+MAX_STORED_ANALYSES = 10000
+MAX_ANALYSIS_AGE_SECONDS = 30 * 24 * 3600  # 30 days
+PRUNE_EVERY_N_WRITES = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    filename TEXT,
+    data BLOB NOT NULL,
+    report_path TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_created_at ON analyses (created_at);
+"""
+
+def serialize_analysis(analysis: Dict[str, Any]) -> bytes:
+    """Compact JSON compressed with zlib"""
+    return zlib.compress(json.dumps(analysis, separators=(',', ':')).encode('utf-8'))
+
+def deserialize_analysis(data: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+class AnalysisStore:
+    """
+    Embedded SQLite store for analysis results.
+
+    The database runs in WAL mode so several workers can read while one
+    writes. Each thread gets its own connection. Old rows are pruned by
+    age and count every PRUNE_EVERY_N_WRITES inserts.
+    """
+
+    def __init__(self, db_path: str, max_rows: int = MAX_STORED_ANALYSES,
+                 max_age_seconds: int = MAX_ANALYSIS_AGE_SECONDS):
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.max_age_seconds = max_age_seconds
+        self._local = threading.local()
+        self._writes_lock = threading.Lock()
+        self._writes = 0
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def save(self, analysis: Dict[str, Any], filename: Optional[str] = None) -> str:
+        """Store an analysis and return its id"""
+
+        analysis_id = uuid.uuid4().hex
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT INTO analyses (id, created_at, filename, data) VALUES (?, ?, ?, ?)',
+                (analysis_id, time.time(), filename, serialize_analysis(analysis))
+            )
+
+        with self._writes_lock:
+            self._writes += 1
+            should_prune = self._writes % PRUNE_EVERY_N_WRITES == 0
+        if should_prune:
+            self.prune()
+
+        return analysis_id
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """Return the stored record (without the cached report path) or None"""
+
+        row = self._connect().execute(
+            'SELECT id, created_at, filename, data FROM analyses WHERE id = ? AND created_at >= ?',
+            (analysis_id, time.time() - self.max_age_seconds)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "id": row[0],
+            "created_at": row[1],
+            "filename": row[2],
+            "analysis": deserialize_analysis(row[3])
+        }
+
+    def get_report_path(self, analysis_id: str) -> Optional[str]:
+        """Return the cached PDF report path if the analysis is unexpired and the file still exists"""
+
+        row = self._connect().execute(
+            'SELECT report_path FROM analyses WHERE id = ? AND created_at >= ?',
+            (analysis_id, time.time() - self.max_age_seconds)
+        ).fetchone()
+
+        if row and row[0] and os.path.exists(row[0]):
+            return row[0]
+        return None
+
+    def set_report_path(self, analysis_id: str, report_path: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute('UPDATE analyses SET report_path = ? WHERE id = ?', (report_path, analysis_id))
+
+    def prune(self) -> int:
+        """Delete analyses past the age or count limits along with their reports"""
+
+        conn = self._connect()
+        cutoff = time.time() - self.max_age_seconds
+
+        try:
+            with conn:
+                expired = dict(conn.execute(
+                    'SELECT id, report_path FROM analyses WHERE created_at < ?', (cutoff,)
+                ).fetchall())
+                expired.update(conn.execute(
+                    'SELECT id, report_path FROM analyses ORDER BY created_at DESC LIMIT -1 OFFSET ?',
+                    (self.max_rows,)
+                ).fetchall())
+                conn.executemany('DELETE FROM analyses WHERE id = ?', [(i,) for i in expired])
+        except sqlite3.Error as e:
+            print(f"Analysis store prune error: {str(e)}")
+            return 0
+
+        for report_path in expired.values():
+            if report_path and os.path.exists(report_path):
+                try:
+                    os.remove(report_path)
+                except OSError:
+                    pass
+
+        return len(expired)
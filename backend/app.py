@@ -2,10 +2,13 @@ from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 import os
 import json
+import uuid
 from werkzeug.utils import secure_filename
-from ai_analyzer import analyze_resume
-from resume_parser import extract_text_from_file
-from utils import allowed_file, generate_pdf_report
+from ai_analyzer import analyze_resume, analyze_resumes_batch
+from coalescer import AnalysisCoalescer, make_analysis_key
+from analysis_store import AnalysisStore
+from resume_parser import extract_text_from_file, get_pdf_backend_stats
+from utils import allowed_file, generate_pdf_report, preflight_check_file
 import traceback
 
 app = Flask(__name__)
@@ -13,8 +16,11 @@ CORS(app)
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
+INFLIGHT_FOLDER = 'inflight'  # per-request lock files shared by all workers
+ANALYSIS_DB_PATH = os.path.join('data', 'analyses.db')
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB max file size
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
+MAX_BATCH_FILES = 32  # one round of concurrent packed AI requests (see ai_analyzer.BATCH_CONCURRENCY)
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
@@ -22,6 +28,30 @@ app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 # Ensure upload directory exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Identical concurrent analyses share one AI call, within and across workers
+analysis_coalescer = AnalysisCoalescer(lock_dir=INFLIGHT_FOLDER)
+
+# Completed analyses are persisted so reports can be fetched by id; analysis
+# still works without the store, only lookups by id are unavailable
+try:
+    analysis_store = AnalysisStore(ANALYSIS_DB_PATH)
+except Exception as e:
+    print(f"Analysis store unavailable: {str(e)}")
+    analysis_store = None
+
+def store_unavailable_response():
+    return jsonify({"error": "Analysis storage is unavailable"}), 503
+
+def store_analysis(analysis, filename):
+    """Persist an analysis, returning its id (None if the store is unavailable)"""
+    if analysis_store is None:
+        return None
+    try:
+        return analysis_store.save(analysis, filename)
+    except Exception as e:
+        print(f"Analysis store error: {str(e)}")
+        return None
+
 @app.route('/')
 def home():
     return jsonify({
@@ -29,7 +59,11 @@ def home():
         "version": "1.0.0",
         "endpoints": {
             "/analyze": "POST - Analyze resume",
-            "/health": "GET - Health check"
+            "/analyze-batch": "POST - Screen multiple resumes against one job description",
+            "/analyses/<id>": "GET - Fetch a stored analysis",
+            "/export-report/<id>": "GET - Download the PDF report for a stored analysis",
+            "/health": "GET - Health check",
+            "/metrics": "GET - Extraction and coalescing statistics for the answering worker"
         }
     })
 
@@ -37,6 +71,15 @@ def home():
 def health_check():
     return jsonify({"status": "healthy", "timestamp": str(datetime.now())})
 
+@app.route('/metrics')
+def metrics():
+    # Counters live in each worker process; scrape every worker and sum them
+    return jsonify({
+        "worker_pid": os.getpid(),
+        "pdf_backends": get_pdf_backend_stats(),
+        "analysis_coalescing": analysis_coalescer.get_stats()
+    })
+
 @app.route('/analyze', methods=['POST'])
 def analyze_resume_endpoint():
     try:
@@ -56,6 +99,11 @@ def analyze_resume_endpoint():
         if not job_description.strip():
             return jsonify({"error": "Job description is required"}), 400
 
+        # Reject mismatched, encrypted, oversized or corrupt files before parsing
+        preflight_error = preflight_check_file(file.stream, file.filename, app.config['MAX_CONTENT_LENGTH'])
+        if preflight_error:
+            return jsonify({"error": preflight_error}), 400
+
         # Save uploaded file
         filename = secure_filename(file.filename)
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
@@ -68,14 +116,20 @@ def analyze_resume_endpoint():
             if not resume_text.strip():
                 return jsonify({"error": "Could not extract text from the resume. Please ensure the file is not corrupted."}), 400
 
-            # Analyze resume with AI
-            analysis_result = analyze_resume(resume_text, job_description)
+            # Analyze resume with AI, sharing the result with identical in-flight requests
+            analysis_result = analysis_coalescer.run(
+                make_analysis_key(resume_text, job_description),
+                lambda: analyze_resume(resume_text, job_description)
+            )
 
             # Clean up uploaded file
             os.remove(file_path)
 
+            analysis_id = store_analysis(analysis_result, filename)
+
             return jsonify({
                 "success": True,
+                "analysis_id": analysis_id,
                 "analysis": analysis_result,
                 "filename": filename
             })
@@ -95,6 +149,76 @@ def analyze_resume_endpoint():
         print(traceback.format_exc())
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/analyze-batch', methods=['POST'])
+def analyze_batch_endpoint():
+    try:
+        files = request.files.getlist('resumes')
+        job_description = request.form.get('job_description', '')
+
+        if not files:
+            return jsonify({"error": "No resume files provided"}), 400
+
+        if len(files) > MAX_BATCH_FILES:
+            return jsonify({"error": f"Too many files. Please upload at most {MAX_BATCH_FILES} resumes."}), 400
+
+        if not job_description.strip():
+            return jsonify({"error": "Job description is required"}), 400
+
+        filenames = []
+        resume_texts = []
+        failures = []
+
+        for file in files:
+            filename = secure_filename(file.filename or '')
+
+            if not filename or not allowed_file(filename):
+                failures.append({"filename": file.filename, "error": "File type not allowed"})
+                continue
+
+            preflight_error = preflight_check_file(file.stream, filename, app.config['MAX_CONTENT_LENGTH'])
+            if preflight_error:
+                failures.append({"filename": filename, "error": preflight_error})
+                continue
+
+            # Concurrent batches may upload files with the same name, so the saved name must be unique
+            file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{uuid.uuid4().hex}_{filename}")
+            file.save(file_path)
+
+            try:
+                resume_text = extract_text_from_file(file_path)
+                if resume_text.strip():
+                    filenames.append(filename)
+                    resume_texts.append(resume_text)
+                else:
+                    failures.append({"filename": filename, "error": "Could not extract text from the resume"})
+            except Exception as extraction_error:
+                failures.append({"filename": filename, "error": str(extraction_error)})
+            finally:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+        analyses, batch_stats = analyze_resumes_batch(resume_texts, job_description) if resume_texts else ([], {})
+        print(f"Batch analysis stats: {json.dumps(batch_stats)}")
+
+        return jsonify({
+            "success": True,
+            "results": [
+                {
+                    "filename": filename,
+                    "analysis_id": store_analysis(analysis, filename),
+                    "analysis": analysis
+                }
+                for filename, analysis in zip(filenames, analyses)
+            ],
+            "failed": failures,
+            "batch_stats": batch_stats
+        })
+
+    except Exception as e:
+        print(f"Server error: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route('/export-report', methods=['POST'])
 def export_report():
     try:
@@ -117,6 +241,55 @@ def export_report():
         print(f"Export error: {str(e)}")
         return jsonify({"error": "Failed to generate report"}), 500
 
+@app.route('/analyses/<analysis_id>')
+def get_analysis(analysis_id):
+    if analysis_store is None:
+        return store_unavailable_response()
+
+    try:
+        record = analysis_store.get(analysis_id)
+
+        if record is None:
+            return jsonify({"error": "Analysis not found"}), 404
+
+        return jsonify({
+            "success": True,
+            "analysis_id": record["id"],
+            "analysis": record["analysis"],
+            "filename": record["filename"]
+        })
+
+    except Exception as e:
+        print(f"Analysis lookup error: {str(e)}")
+        return jsonify({"error": "Failed to load analysis"}), 500
+
+@app.route('/export-report/<analysis_id>')
+def export_stored_report(analysis_id):
+    if analysis_store is None:
+        return store_unavailable_response()
+
+    try:
+        # Reuse the report generated on a previous export
+        pdf_path = analysis_store.get_report_path(analysis_id)
+
+        if pdf_path is None:
+            record = analysis_store.get(analysis_id)
+            if record is None:
+                return jsonify({"error": "Analysis not found"}), 404
+
+            pdf_path = generate_pdf_report(record["analysis"], report_id=analysis_id)
+            analysis_store.set_report_path(analysis_id, pdf_path)
+
+        return send_from_directory(
+            directory=os.path.dirname(pdf_path),
+            path=os.path.basename(pdf_path),
+            as_attachment=True
+        )
+
+    except Exception as e:
+        print(f"Export error: {str(e)}")
+        return jsonify({"error": "Failed to generate report"}), 500
+
 if __name__ == '__main__':
     from datetime import datetime
     app.run(debug=True, host='127.0.0.1', port=5000)
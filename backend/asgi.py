@@ -0,0 +1,216 @@
+"""
+Async serving mode.
+
+The analyze path runs on an event loop so one process can keep many
+analyses in flight while they wait on the AI API. CPU-bound work (text
+extraction, SQLite writes, PDF rendering) runs in a thread pool, and all
+other routes are passed through to the Flask app.
+
+Run with:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import contextlib
+import os
+import shutil
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse
+from starlette.routing import Route
+from werkzeug.utils import secure_filename
+
+from ai_analyzer import analyze_resume_async, close_async_http_client
+from app import app as flask_app, analysis_coalescer, analysis_store, store_analysis
+from coalescer import make_analysis_key
+from resume_parser import extract_text_from_file
+from utils import allowed_file, generate_pdf_report, preflight_check_file
+
+# Threads for extraction, storage and report rendering
+EXECUTOR_WORKERS = int(os.environ.get('ASYNC_EXECUTOR_WORKERS', '8'))
+# Threads serving the Flask routes (batch screening, metrics, stored analyses...)
+FLASK_WSGI_WORKERS = int(os.environ.get('FLASK_WSGI_WORKERS', '8'))
+
+executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix='resume-cpu')
+
+async def run_blocking(func, *args):
+    """Run a blocking function on the CPU executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+class RequestTooLarge(Exception):
+    pass
+
+def limit_request_body(request, max_size):
+    """Return a copy of the request whose body stream fails once it exceeds max_size"""
+
+    received = 0
+
+    async def receive():
+        nonlocal received
+        message = await request.receive()
+        if message['type'] == 'http.request':
+            received += len(message.get('body', b''))
+            if received > max_size:
+                raise RequestTooLarge()
+        return message
+
+    return Request(request.scope, receive)
+
+def too_large_response(max_size):
+    return JSONResponse({"error": f"File is too large. Maximum size is {max_size // (1024 * 1024)}MB."}, status_code=413)
+
+def save_upload(upload, file_path):
+    """Copy an uploaded file to disk"""
+    upload.file.seek(0)
+    with open(file_path, 'wb') as f:
+        shutil.copyfileobj(upload.file, f)
+
+async def analyze_resume_endpoint(request):
+    try:
+        # Same request size limit Flask enforces through MAX_CONTENT_LENGTH
+        max_size = flask_app.config['MAX_CONTENT_LENGTH']
+        content_length = request.headers.get('content-length', '')
+        if content_length.isdigit() and int(content_length) > max_size:
+            return too_large_response(max_size)
+
+        # Chunked uploads carry no Content-Length, so the stream is capped too
+        try:
+            form = await limit_request_body(request, max_size).form()
+        except RequestTooLarge:
+            return too_large_response(max_size)
+
+        upload = form.get('resume')
+        job_description = form.get('job_description', '')
+
+        # Check if file is present
+        if upload is None or isinstance(upload, str):
+            return JSONResponse({"error": "No resume file provided"}, status_code=400)
+
+        if not upload.filename:
+            return JSONResponse({"error": "No file selected"}, status_code=400)
+
+        if not allowed_file(upload.filename):
+            return JSONResponse({"error": "File type not allowed. Please upload PDF or DOCX files only."}, status_code=400)
+
+        if not job_description.strip():
+            return JSONResponse({"error": "Job description is required"}, status_code=400)
+
+        # Reject mismatched, encrypted, oversized or corrupt files before parsing
+        preflight_error = preflight_check_file(upload.file, upload.filename, flask_app.config['MAX_CONTENT_LENGTH'])
+        if preflight_error:
+            return JSONResponse({"error": preflight_error}, status_code=400)
+
+        # Many uploads are in flight at once, so the saved name must be unique
+        filename = secure_filename(upload.filename)
+        file_path = os.path.join(flask_app.config['UPLOAD_FOLDER'], f"{uuid.uuid4().hex}_{filename}")
+        await run_blocking(save_upload, upload, file_path)
+
+        try:
+            # Extract text from resume
+            resume_text = await run_blocking(extract_text_from_file, file_path)
+
+            if not resume_text.strip():
+                return JSONResponse({"error": "Could not extract text from the resume. Please ensure the file is not corrupted."}, status_code=400)
+
+            # Analyze resume with AI, sharing the result with identical in-flight requests
+            analysis_result = await analysis_coalescer.run_async(
+                make_analysis_key(resume_text, job_description),
+                lambda: analyze_resume_async(resume_text, job_description)
+            )
+
+            analysis_id = await run_blocking(store_analysis, analysis_result, filename)
+
+            return JSONResponse({
+                "success": True,
+                "analysis_id": analysis_id,
+                "analysis": analysis_result,
+                "filename": filename
+            })
+
+        except Exception as analysis_error:
+            print(f"Analysis error: {str(analysis_error)}")
+            return JSONResponse({
+                "error": f"Analysis failed: {str(analysis_error)}"
+            }, status_code=500)
+
+        finally:
+            # Clean up uploaded file
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    except Exception as e:
+        print(f"Server error: {str(e)}")
+        print(traceback.format_exc())
+        return JSONResponse({"error": "Internal server error"}, status_code=500)
+
+def render_stored_report(analysis_id):
+    """Return the cached report path, rendering it first if needed (None if unknown id)"""
+
+    pdf_path = analysis_store.get_report_path(analysis_id)
+    if pdf_path is not None:
+        return pdf_path
+
+    record = analysis_store.get(analysis_id)
+    if record is None:
+        return None
+
+    pdf_path = generate_pdf_report(record["analysis"], report_id=analysis_id)
+    analysis_store.set_report_path(analysis_id, pdf_path)
+    return pdf_path
+
+async def export_stored_report(request):
+    if analysis_store is None:
+        return JSONResponse({"error": "Analysis storage is unavailable"}, status_code=503)
+
+    try:
+        pdf_path = await run_blocking(render_stored_report, request.path_params['analysis_id'])
+
+        if pdf_path is None:
+            return JSONResponse({"error": "Analysis not found"}, status_code=404)
+
+        return FileResponse(pdf_path, media_type='application/pdf', filename=os.path.basename(pdf_path))
+
+    except Exception as e:
+        print(f"Export error: {str(e)}")
+        return JSONResponse({"error": "Failed to generate report"}, status_code=500)
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    await close_async_http_client()
+    executor.shutdown(wait=False)
+
+# Async routes get their own CORS handling; the Flask routes keep Flask-CORS
+async_app = Starlette(
+    routes=[
+        Route('/analyze', analyze_resume_endpoint, methods=['POST']),
+        Route('/export-report/{analysis_id}', export_stored_report, methods=['GET'])
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+    ],
+    lifespan=lifespan
+)
+
+# Everything else is served by Flask on its own thread pool, so a slow
+# request (e.g. a 50-file batch) does not hold up the other Flask routes
+flask_asgi_app = WSGIMiddleware(flask_app, workers=FLASK_WSGI_WORKERS)
+
+def is_async_route(path):
+    return path == '/analyze' or path.startswith('/export-report/')
+
+async def application(scope, receive, send):
+    """ASGI entry point dispatching between the async routes and the Flask app"""
+
+    if scope['type'] == 'lifespan' or (scope['type'] == 'http' and is_async_route(scope['path'])):
+        await async_app(scope, receive, send)
+    else:
+        await flask_asgi_app(scope, receive, send)
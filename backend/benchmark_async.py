@@ -0,0 +1,219 @@
+"""
+Benchmark the sync (gunicorn) and async (uvicorn) serving modes at equal memory.
+
+A local mock of the Gemini API answers after a fixed delay, so the
+benchmark measures how many analyses each mode keeps in flight rather
+than the real API's speed. The async server runs as one process; the sync
+server gets as many workers as fit in the async server's resident memory.
+
+Usage (Linux, from the backend directory):
+    python benchmark_async.py --requests 200 --concurrency 50 --latency 2.0
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+MOCK_RESPONSE = {
+    "match_score": 72,
+    "matched_skills": ["Python", "SQL"],
+    "missing_skills": ["AWS"],
+    "matched_keywords": ["backend"],
+    "missing_keywords": ["cloud"],
+    "suggestions": ["Highlight cloud experience"],
+    "strengths": ["Solid backend background"],
+    "weaknesses": ["Limited cloud exposure"],
+    "overall_assessment": "Benchmark response",
+    "recommendation": "CONSIDER"
+}
+
+SAMPLE_RESUME = """Jane Doe
+jane.doe@example.com 555-123-4567
+Summary
+Backend engineer focused on Python services.
+Experience
+Acme Corp, Senior Engineer, Jan 2019 - Present
+Built Flask APIs and PostgreSQL data pipelines.
+Beta Inc, Engineer, 03/2015 to 12/2018
+Education
+B.Sc. Computer Science, 2011 - 2015
+Skills: Python, SQL, Docker, Git
+"""
+
+def make_mock_gemini_handler(latency):
+    class MockGeminiHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(latency)
+            body = json.dumps({
+                "candidates": [{"content": {"parts": [{"text": json.dumps(MOCK_RESPONSE)}]}}]
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockGeminiHandler
+
+def build_sample_docx():
+    """Build a minimal DOCX resume in memory"""
+
+    ns = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    paragraphs = ''.join(
+        f'<w:p><w:r><w:t xml:space="preserve">{line}</w:t></w:r></w:p>'
+        for line in SAMPLE_RESUME.strip().split('\n')
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('word/document.xml', f'<w:document {ns}><w:body>{paragraphs}</w:body></w:document>')
+    return buffer.getvalue()
+
+def process_tree_rss_mb(pid):
+    """Resident memory of a process and its children in MB (Linux /proc)"""
+
+    total_kb = 0
+    pids = [pid]
+    while pids:
+        current = pids.pop()
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+            with open(f'/proc/{current}/task/{current}/children') as f:
+                pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return total_kb / 1024
+
+def start_server(command, env, port):
+    """Start a server subprocess and wait until it answers"""
+
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f'http://127.0.0.1:{port}/', timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"Server did not start: {' '.join(command)}")
+
+def stop_server(process):
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait(timeout=30)
+
+async def run_load(port, total_requests, concurrency, docx_bytes, tag):
+    """Send analyze requests and return per-request latencies and failures"""
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async with httpx.AsyncClient(timeout=300) as client:
+        async def one(index):
+            nonlocal failures
+            async with semaphore:
+                # A distinct job description per request and per run keeps coalescing out of the comparison
+                data = {'job_description': f'Python backend engineer, 3 years of experience ({tag} {index})'}
+                files = {'resume': ('resume.docx', docx_bytes)}
+                start = time.perf_counter()
+                response = await client.post(f'http://127.0.0.1:{port}/analyze', data=data, files=files)
+                latencies.append(time.perf_counter() - start)
+                # A fallback analysis means the mock API was never reached
+                if (response.status_code != 200 or
+                        response.json()['analysis'].get('overall_assessment') != MOCK_RESPONSE['overall_assessment']):
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total_requests)))
+        elapsed = time.perf_counter() - start
+
+    return latencies, failures, elapsed
+
+def summarize(name, latencies, failures, elapsed, rss_mb, workers):
+    latencies = sorted(latencies)
+    return {
+        "mode": name,
+        "workers": workers,
+        "rss_mb": round(rss_mb, 1),
+        "requests": len(latencies),
+        "failures": failures,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000),
+        "rps_per_100mb": round(len(latencies) / elapsed / rss_mb * 100, 2)
+    }
+
+def benchmark(command_factory, name, workers, env, port, args, docx_bytes):
+    process = start_server(command_factory(workers), env, port)
+    try:
+        rss_mb = process_tree_rss_mb(process.pid)
+        latencies, failures, elapsed = asyncio.run(run_load(port, args.requests, args.concurrency, docx_bytes, f'{name}-{time.time()}'))
+        # Measure again under load-warmed state and keep the larger figure
+        rss_mb = max(rss_mb, process_tree_rss_mb(process.pid))
+        return summarize(name, latencies, failures, elapsed, rss_mb, workers), rss_mb
+    finally:
+        stop_server(process)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=2.0, help='mock AI API latency in seconds')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--mock-port', type=int, default=5056)
+    args = parser.parse_args()
+
+    ThreadingHTTPServer.request_queue_size = max(128, args.concurrency * 2)
+    mock_server = ThreadingHTTPServer(('127.0.0.1', args.mock_port), make_mock_gemini_handler(args.latency))
+    threading.Thread(target=mock_server.serve_forever, daemon=True).start()
+
+    env = dict(os.environ)
+    env['GEMINI_API_URL'] = f'http://127.0.0.1:{args.mock_port}/generate'
+    env['GEMINI_API_KEY'] = 'benchmark'
+    docx_bytes = build_sample_docx()
+    bind = f'127.0.0.1:{args.port}'
+
+    def async_command(workers):
+        return [sys.executable, '-m', 'uvicorn', 'asgi:application', '--host', '127.0.0.1',
+                '--port', str(args.port), '--workers', str(workers), '--log-level', 'warning']
+
+    def sync_command(workers):
+        return [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', bind, '--timeout', '300', 'app:app']
+
+    async_result, async_rss = benchmark(async_command, 'async', 1, env, args.port, args, docx_bytes)
+
+    # Size the sync pool to the async server's memory: measure one worker first
+    probe = start_server(sync_command(1), env, args.port)
+    try:
+        per_worker_rss = process_tree_rss_mb(probe.pid) / 2  # master + one worker
+    finally:
+        stop_server(probe)
+    sync_workers = max(1, int(async_rss // max(per_worker_rss, 1)) - 1)
+
+    sync_result, _ = benchmark(sync_command, 'sync', sync_workers, env, args.port, args, docx_bytes)
+
+    mock_server.shutdown()
+    print(json.dumps([sync_result, async_result], indent=2))
+
+if __name__ == '__main__':
+    main()
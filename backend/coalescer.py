@@ -0,0 +1,294 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+try:
+    import fcntl  # POSIX only; cross-worker coalescing is skipped without it
+except ImportError:
+    fcntl = None
+
+# How long a finished result stays readable by workers that were blocked on the lock
+SHARED_RESULT_TTL_SECONDS = 10
+# Lock and result files older than this are swept from the lock directory
+STALE_FILE_SECONDS = 3600
+SWEEP_INTERVAL_SECONDS = 300
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different uploads share a key"""
+    return ' '.join(text.split()) if text else ""
+
+def make_analysis_key(resume_text: str, job_description: str) -> str:
+    """Build the coalescing key for a (resume, job description) pair"""
+    digest = hashlib.sha256()
+    digest.update(normalize_text(resume_text).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_text(job_description).encode('utf-8'))
+    return digest.hexdigest()
+
+class _InFlightCall:
+    """A computation that concurrent callers in this process wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class AnalysisCoalescer:
+    """
+    Single-flight execution of identical analyses.
+
+    Concurrent callers with the same key in one process wait on a single
+    computation. Across worker processes an exclusive file lock per key
+    serializes the leaders, and the first one publishes its result so the
+    others can reuse it instead of calling the AI API again. run() serves
+    threaded workers and run_async() serves the asyncio mode.
+    """
+
+    def __init__(self, lock_dir: Optional[str] = None, result_ttl: int = SHARED_RESULT_TTL_SECONDS):
+        self.lock_dir = lock_dir
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._async_inflight = {}
+        self._last_sweep = 0.0
+        self._stats = {
+            'requests': 0,
+            'computed': 0,
+            'coalesced_in_process': 0,
+            'coalesced_cross_worker': 0,
+            'recent_result_hits': 0
+        }
+
+        if self.lock_dir and fcntl is not None:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    def run(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return compute()'s result, sharing it with identical concurrent calls"""
+
+        with self._lock:
+            self._stats['requests'] += 1
+            call = self._inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _InFlightCall()
+                self._inflight[key] = call
+
+        if not is_leader:
+            call.event.wait()
+            with self._lock:
+                self._stats['coalesced_in_process'] += 1
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = self._run_shared(key, compute)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+        return copy.deepcopy(call.result)
+
+    async def run_async(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Awaitable run(): identical concurrent coroutines share one computation"""
+
+        with self._lock:
+            self._stats['requests'] += 1
+            task = self._async_inflight.get(key)
+            is_leader = task is None
+            if is_leader:
+                task = asyncio.ensure_future(self._run_shared_async(key, compute))
+                self._async_inflight[key] = task
+                task.add_done_callback(lambda done: self._finish_async(key, done))
+
+        # The computation runs in its own task, so a cancelled caller (leader
+        # included) only stops its own wait; shield() keeps it from cancelling the task
+        result = await asyncio.shield(task)
+
+        if not is_leader:
+            with self._lock:
+                self._stats['coalesced_in_process'] += 1
+        return copy.deepcopy(result)
+
+    def _finish_async(self, key: str, task: 'asyncio.Future') -> None:
+        with self._lock:
+            if self._async_inflight.get(key) is task:
+                del self._async_inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller was cancelled
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return request counts and the share of requests served by coalescing.
+
+        Counters cover this worker process only. recent_result_hits counts
+        repeats served from a published result without waiting on another
+        worker; they are not concurrent duplicates and stay out of coalesce_rate.
+        """
+
+        with self._lock:
+            stats = dict(self._stats)
+            inflight = len(self._inflight) + len(self._async_inflight)
+
+        coalesced = stats['coalesced_in_process'] + stats['coalesced_cross_worker']
+        stats['in_flight'] = inflight
+        stats['coalesce_rate'] = round(coalesced / stats['requests'], 3) if stats['requests'] else 0.0
+        stats['cross_worker_enabled'] = bool(self.lock_dir) and fcntl is not None
+        return stats
+
+    def _run_shared(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Run compute() under the cross-worker lock when it is available"""
+
+        if not self.lock_dir or fcntl is None:
+            return self._compute(compute)
+
+        lock_path = os.path.join(self.lock_dir, f"{key}.lock")
+        result_path = os.path.join(self.lock_dir, f"{key}.json")
+
+        with open(lock_path, 'a') as lock_file:
+            waited = self._acquire_lock(lock_file.fileno())
+            self._touch(lock_path)
+            try:
+                shared = self._read_shared_result(result_path)
+                if shared is not None:
+                    self._count_shared_hit(waited)
+                    return shared
+
+                result = self._compute(compute)
+                self._write_shared_result(result_path, result)
+                return result
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    async def _run_shared_async(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Async _run_shared(): the blocking flock waits in an executor thread"""
+
+        if not self.lock_dir or fcntl is None:
+            with self._lock:
+                self._stats['computed'] += 1
+            return await compute()
+
+        loop = asyncio.get_running_loop()
+        lock_path = os.path.join(self.lock_dir, f"{key}.lock")
+        result_path = os.path.join(self.lock_dir, f"{key}.json")
+
+        lock_file = open(lock_path, 'a')
+        acquire = loop.run_in_executor(None, self._acquire_lock, lock_file.fileno())
+        try:
+            waited = await asyncio.shield(acquire)
+        except BaseException:
+            # The executor thread may still be blocked in flock(); close only once it returns
+            acquire.add_done_callback(lambda _: lock_file.close())
+            raise
+
+        self._touch(lock_path)
+        with lock_file:
+            try:
+                shared = self._read_shared_result(result_path)
+                if shared is not None:
+                    self._count_shared_hit(waited)
+                    return shared
+
+                with self._lock:
+                    self._stats['computed'] += 1
+                result = await compute()
+                self._write_shared_result(result_path, result)
+                return result
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _acquire_lock(fileno: int) -> bool:
+        """Take the exclusive lock; True when another worker was holding it"""
+        try:
+            fcntl.flock(fileno, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return False
+        except BlockingIOError:
+            fcntl.flock(fileno, fcntl.LOCK_EX)
+            return True
+
+    def _count_shared_hit(self, waited: bool) -> None:
+        """A published result only counts as coalesced if we waited on its leader"""
+        with self._lock:
+            self._stats['coalesced_cross_worker' if waited else 'recent_result_hits'] += 1
+
+    def _touch(self, lock_path: str) -> None:
+        """Refresh a held lock file's mtime so the sweep treats it as in use"""
+        try:
+            os.utime(lock_path)
+        except OSError:
+            pass
+
+    def _compute(self, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._stats['computed'] += 1
+        return compute()
+
+    def _read_shared_result(self, result_path: str) -> Optional[Any]:
+        """Read a result another worker published within the TTL"""
+
+        try:
+            if time.time() - os.path.getmtime(result_path) > self.result_ttl:
+                return None
+            with open(result_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_shared_result(self, result_path: str, result: Any) -> None:
+        """Publish a result atomically for workers waiting on the same key"""
+
+        try:
+            tmp_path = f"{result_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(result, f, separators=(',', ':'))
+            os.replace(tmp_path, result_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Coalescing result write error: {str(e)}")
+
+        self._sweep_stale_files()
+
+    def _sweep_stale_files(self) -> None:
+        """Remove old lock and result files so the directory does not grow unbounded"""
+
+        now = time.time()
+        if now - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+            return
+        self._last_sweep = now
+
+        try:
+            for name in os.listdir(self.lock_dir):
+                path = os.path.join(self.lock_dir, name)
+                try:
+                    if now - os.path.getmtime(path) <= STALE_FILE_SECONDS:
+                        continue
+                    if name.endswith('.lock'):
+                        self._remove_unlocked(path)
+                    else:
+                        os.remove(path)
+                except OSError:
+                    pass
+        except OSError as e:
+            print(f"Coalescing sweep error: {str(e)}")
+
+    def _remove_unlocked(self, lock_path: str) -> None:
+        """Delete a lock file only while no worker holds it"""
+
+        with open(lock_path, 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return  # held by a worker that is still computing
+            try:
+                os.remove(lock_path)
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -1,9 +1,110 @@
 import os
 import PyPDF2
 import docx
+import importlib.util
 import io
+import re
+import threading
+import time
+import unicodedata
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
+# WordprocessingML namespaces used by the streaming DOCX extractor
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_NS = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+DOCX_HEADER_PATTERN = re.compile(r'^word/header\d*\.xml$')
+DOCX_FOOTER_PATTERN = re.compile(r'^word/footer\d*\.xml$')
+
+# PDF extraction quality thresholds
+PDF_MIN_TEXT_LENGTH = 50           # fewer characters than this means extraction failed
+PDF_MAX_GARBAGE_RATIO = 0.05       # share of replacement/control/private-use characters
+PDF_MAX_AVG_WORD_LENGTH = 15       # longer average "words" mean spaces were lost
+PDF_BACKEND_MIN_SAMPLES = 20       # same-document samples before stats influence ordering
+PDF_BACKEND_SAMPLE_EVERY = 50      # run all backends on every Nth PDF to compare them
+PDF_BACKEND_MIN_SUCCESS_RATE = 0.9 # backends below this are tried after the reliable ones
+
+# Standard resume sections and the headings that introduce them
+RESUME_SECTION_HEADINGS = {
+    'Summary': ['summary', 'professional summary', 'career summary', 'profile',
+                'professional profile', 'objective', 'career objective', 'about me'],
+    'Experience': ['experience', 'work experience', 'professional experience',
+                   'employment', 'employment history', 'work history', 'career history',
+                   'relevant experience'],
+    'Education': ['education', 'academic background', 'academic qualifications',
+                  'education and training', 'educational background', 'qualifications'],
+    'Skills': ['skills', 'technical skills', 'key skills', 'core competencies',
+               'competencies', 'skills and abilities', 'technologies', 'tech stack'],
+    'Projects': ['projects', 'personal projects', 'academic projects', 'key projects',
+                 'selected projects'],
+    'Certifications': ['certifications', 'certificates', 'certification',
+                       'licenses and certifications', 'certifications and licenses']
+}
+
+# A heading is a whole line, optionally followed by ":" and inline content ("Skills: Python, SQL")
+SECTION_HEADING_PATTERNS = {
+    section: re.compile(
+        r'^[^\w]{0,3}(?:' + '|'.join(re.escape(h) for h in sorted(headings, key=len, reverse=True)) +
+        r')\s*(?:[:\-\u2013|]\s*(?P<inline>.*))?$',
+        re.IGNORECASE
+    )
+    for section, headings in RESUME_SECTION_HEADINGS.items()
+}
+
+SECTION_HEADING_MAX_LENGTH = 40     # longer bare lines are body text, not headings
+LAYOUT_SHORT_LINE_LENGTH = 25       # average line length below this suggests columns/tables
+LAYOUT_MIN_LINES = 40
+RESUME_MIN_WORDS = 150
+RESUME_MAX_WORDS = 1200
+NON_STANDARD_BULLETS = set('\u27a2\u2756\u2713\u2714\u27a4\u25ba\u2605\u2606\u25c6\u25c7\u2666')
+
+# Employment date ranges ("Jan 2019 - Present", "03/2017 to 06/2020", "2015 – 2018")
+MONTH_NUMBERS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+DATE_TOKEN = (
+    r'(?:(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+    r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b\.?,?\s+\d{4}'
+    r'|\d{1,2}/\d{4}|\d{4})'
+)
+DATE_RANGE_PATTERN = re.compile(
+    r'(?<![\w/])(?P<start>' + DATE_TOKEN + r')\s*(?:-|\u2013|\u2014|to|until)\s*'
+    r'(?P<end>' + DATE_TOKEN + r'|present|current|now|today|date)\b',
+    re.IGNORECASE
+)
+STATED_YEARS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\+?\s*years?\s*(?:of\s*)?(?:professional\s*)?experience', re.IGNORECASE)
+EARLIEST_CAREER_YEAR = 1950
+
+# Degree levels, highest first. Shared by resume parsing and
+# utils.extract_job_requirements so both sides name degrees the same way.
+# Bare two-letter abbreviations (BS, MS, BE, ME...) also name other things,
+# so they only count when followed by degree context ("BS/MS in", "BE degree").
+DEGREE_CONTEXT = r'(?=(?:\s*(?:/|,|or)\s*[A-Z][A-Za-z.]{1,6})*\s*(?:(?:in|of)\s|degree))'
+DEGREE_LEVELS = [
+    ('PhD/Doctorate', 4, re.compile(
+        r'\b(?:ph\.?\s?d|doctorate|doctor of|d\.?phil)(?![a-z])', re.IGNORECASE)),
+    ("Master's degree", 3, re.compile(
+        r"\b(?:master'?s|master of|master degree|m\.\s?s\.?|m\.?sc|mba|m\.?tech|m\.?eng|m\.\s?e\.?"
+        r"|m\.\s?a\.?|m\.?com|mca|m\.?phil)(?![a-z])"
+        r'|(?-i:\b(?:MS|MA|ME)\b)' + DEGREE_CONTEXT, re.IGNORECASE)),
+    ("Bachelor's degree", 2, re.compile(
+        r"\b(?:bachelor'?s?|b\.\s?s\.?|b\.?sc|b\.?tech|b\.?eng|b\.\s?e\.?|b\.\s?a\.?|b\.?com|bca|bba"
+        r"|undergraduate degree)(?![a-z])"
+        r'|(?-i:\b(?:BS|BA|BE)\b)' + DEGREE_CONTEXT, re.IGNORECASE)),
+    ('Associate degree', 1, re.compile(r"\b(?:associate'?s? degree|associate of)(?![a-z])", re.IGNORECASE))
+]
+# Phrases that contain a degree word without naming a degree
+DEGREE_FALSE_POSITIVES = re.compile(
+    r"\b(?:scrum|web|quiz|head|grand|task|toast)\s*master'?s?\b"
+    r'|\bmaster\s+(?:data|class|branch|file|node|plan|record|list)'
+    r'|\bms[\s-]+(?:office|sql|excel|word|teams|project|access|outlook|powerpoint|dynamics|visio|windows)\b',
+    re.IGNORECASE
+)
+
 def extract_text_from_file(file_path: str) -> str:
     """
     Extract text from PDF or DOCX files
@@ -22,8 +123,189 @@ def extract_text_from_file(file_path: str) -> str:
         print(f"Text extraction error: {str(e)}")
         raise Exception(f"Failed to extract text from file: {str(e)}")
 
+# PDF backend registry: name -> extractor returning raw (uncleaned) text.
+# Backends are tried in registration order (cheapest first) until one passes
+# the quality checks. Those escalation stats are not comparable across
+# backends (later backends only see PDFs the earlier ones failed), so every
+# PDF_BACKEND_SAMPLE_EVERY-th PDF runs through all backends and only these
+# same-document samples decide the order.
+PDF_BACKENDS = {}
+PDF_BACKEND_STATS = {}
+_pdf_stats_lock = threading.Lock()
+_pdf_extraction_count = 0
+
+def _new_backend_stats() -> dict:
+    return {
+        'calls': 0,
+        'successes': 0,
+        'errors': 0,
+        'total_time': 0.0,
+        'sampled_calls': 0,
+        'sampled_successes': 0,
+        'sampled_time': 0.0
+    }
+
+def register_pdf_backend(name: str, extractor) -> None:
+    """Register a PDF text extraction backend"""
+    PDF_BACKENDS[name] = extractor
+    with _pdf_stats_lock:
+        PDF_BACKEND_STATS.setdefault(name, _new_backend_stats())
+
+def record_pdf_backend_result(name: str, elapsed: float, success: bool, error: bool = False,
+                              sampled: bool = False) -> None:
+    """Record the outcome and timing of a backend call"""
+    with _pdf_stats_lock:
+        stats = PDF_BACKEND_STATS.setdefault(name, _new_backend_stats())
+        if sampled:
+            stats['sampled_calls'] += 1
+            stats['sampled_time'] += elapsed
+            if success:
+                stats['sampled_successes'] += 1
+            return
+
+        stats['calls'] += 1
+        stats['total_time'] += elapsed
+        if success:
+            stats['successes'] += 1
+        if error:
+            stats['errors'] += 1
+
+def get_pdf_backend_stats() -> dict:
+    """
+    Return per-backend call counts, success rates and average timings.
+
+    calls/success_rate/avg_time_ms describe the escalation path; the
+    sampled_* figures come from runs of every backend on the same PDFs.
+    Stats are kept per worker process.
+    """
+    with _pdf_stats_lock:
+        report = {}
+        for name, stats in PDF_BACKEND_STATS.items():
+            calls = stats['calls']
+            sampled = stats['sampled_calls']
+            report[name] = {
+                'calls': calls,
+                'successes': stats['successes'],
+                'errors': stats['errors'],
+                'success_rate': round(stats['successes'] / calls, 3) if calls else None,
+                'avg_time_ms': round(stats['total_time'] / calls * 1000, 2) if calls else None,
+                'sampled_calls': sampled,
+                'sampled_success_rate': round(stats['sampled_successes'] / sampled, 3) if sampled else None,
+                'sampled_avg_time_ms': round(stats['sampled_time'] / sampled * 1000, 2) if sampled else None
+            }
+        return report
+
+def get_pdf_backend_order() -> list:
+    """
+    Order backends so the fastest one that is good enough for our corpus runs first.
+
+    Only same-document samples are used; until every backend has
+    PDF_BACKEND_MIN_SAMPLES of them, registration order is kept.
+    """
+    names = list(PDF_BACKENDS)
+    stats = get_pdf_backend_stats()
+
+    if any(stats[name]['sampled_calls'] < PDF_BACKEND_MIN_SAMPLES for name in names):
+        return names
+
+    reliable = [n for n in names if stats[n]['sampled_success_rate'] >= PDF_BACKEND_MIN_SUCCESS_RATE]
+    unreliable = [n for n in names if n not in reliable]
+    reliable.sort(key=lambda n: stats[n]['sampled_avg_time_ms'])
+    unreliable.sort(key=lambda n: -stats[n]['sampled_success_rate'])
+    return reliable + unreliable
+
+def _should_sample_pdf_backends() -> bool:
+    """True for every PDF_BACKEND_SAMPLE_EVERY-th extraction when several backends exist"""
+    global _pdf_extraction_count
+    with _pdf_stats_lock:
+        _pdf_extraction_count += 1
+        return len(PDF_BACKENDS) > 1 and _pdf_extraction_count % PDF_BACKEND_SAMPLE_EVERY == 0
+
+def assess_text_quality(text: str) -> list:
+    """Return a list of problems with extracted text (empty list means acceptable)"""
+
+    issues = []
+    stripped = text.strip() if text else ""
+
+    if len(stripped) < PDF_MIN_TEXT_LENGTH:
+        issues.append("empty text")
+        return issues
+
+    non_space = [ch for ch in stripped if not ch.isspace()]
+    garbage = sum(
+        1 for ch in non_space
+        if ch == '\ufffd' or unicodedata.category(ch) in ('Cc', 'Co', 'Cs', 'Cn')
+    )
+    # pdfminer emits "(cid:123)" for glyphs it cannot map
+    garbage += stripped.count('(cid:') * 8
+    if garbage / max(len(non_space), 1) > PDF_MAX_GARBAGE_RATIO:
+        issues.append("garbage characters")
+
+    words = stripped.split()
+    if words and len(non_space) / len(words) > PDF_MAX_AVG_WORD_LENGTH:
+        issues.append("missing spaces")
+
+    return issues
+
+def _run_pdf_backend(name: str, pdf_path: str, sampled: bool = False) -> tuple:
+    """Run one backend and record it; returns (text, issues, error message)"""
+
+    start_time = time.perf_counter()
+
+    try:
+        raw_text = PDF_BACKENDS[name](pdf_path)
+    except Exception as e:
+        record_pdf_backend_result(name, time.perf_counter() - start_time, success=False, error=True, sampled=sampled)
+        return "", [], str(e)
+
+    text = clean_extracted_text(raw_text)
+    issues = assess_text_quality(text)
+    record_pdf_backend_result(name, time.perf_counter() - start_time, success=not issues, sampled=sampled)
+    return text, issues, None
+
 def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract text from PDF using PyPDF2"""
+    """Extract text from PDF, escalating to slower backends only when quality is poor"""
+
+    order = get_pdf_backend_order()
+
+    if _should_sample_pdf_backends():
+        # Run every backend on this document so their stats are comparable
+        outcomes = [(name,) + _run_pdf_backend(name, pdf_path, sampled=True) for name in order]
+    else:
+        outcomes = None
+
+    best_text = ""
+    best_issue_count = None
+    failures = []
+
+    for position, name in enumerate(order):
+        if outcomes is not None:
+            _, text, issues, error = outcomes[position]
+        else:
+            text, issues, error = _run_pdf_backend(name, pdf_path)
+
+        if error is not None:
+            failures.append(f"{name}: {error}")
+            continue
+
+        if not issues:
+            return text
+
+        failures.append(f"{name}: {', '.join(issues)}")
+        if text.strip() and (best_issue_count is None or len(issues) < best_issue_count):
+            best_text = text
+            best_issue_count = len(issues)
+
+    if best_text:
+        # Nothing passed the checks; imperfect text is still better than a rejection
+        print(f"PDF extraction quality issues: {'; '.join(failures)}")
+        return best_text
+
+    print(f"PDF extraction error: {'; '.join(failures)}")
+    raise Exception(f"Failed to extract text from PDF: {'; '.join(failures)}")
+
+def extract_text_from_pdf_pypdf2(pdf_path: str) -> str:
+    """Extract raw text from PDF using PyPDF2"""
 
     try:
         text = ""
@@ -44,13 +326,24 @@ def extract_text_from_pdf(pdf_path: str) -> str:
         if not text.strip():
             raise Exception("No text could be extracted from PDF")
 
-        return clean_extracted_text(text)
+        return text
 
     except Exception as e:
-        print(f"PDF extraction error: {str(e)}")
-        raise Exception(f"Failed to extract text from PDF: {str(e)}")
+        raise Exception(f"PyPDF2 extraction failed: {str(e)}")
 
 def extract_text_from_docx(docx_path: str) -> str:
+    """Extract text from DOCX, streaming the XML first and using python-docx as fallback"""
+
+    try:
+        text = extract_text_from_docx_streaming(docx_path)
+        if text.strip():
+            return text
+    except Exception as e:
+        print(f"Streaming DOCX extraction failed, falling back to python-docx: {str(e)}")
+
+    return extract_text_from_docx_python_docx(docx_path)
+
+def extract_text_from_docx_python_docx(docx_path: str) -> str:
     """Extract text from DOCX using python-docx"""
 
     try:
@@ -79,6 +372,112 @@ def extract_text_from_docx(docx_path: str) -> str:
         print(f"DOCX extraction error: {str(e)}")
         raise Exception(f"Failed to extract text from DOCX: {str(e)}")
 
+def extract_text_from_docx_streaming(docx_path: str) -> str:
+    """
+    Extract text from DOCX by streaming the package XML without building a DOM.
+
+    Paragraphs and table rows are emitted in document order, merged table
+    cells are emitted once, and headers, footers and text boxes are included.
+    """
+
+    with zipfile.ZipFile(docx_path) as package:
+        names = package.namelist()
+        header_parts = sorted(n for n in names if DOCX_HEADER_PATTERN.match(n))
+        footer_parts = sorted(n for n in names if DOCX_FOOTER_PATTERN.match(n))
+
+        lines = []
+        seen_margin_lines = set()
+
+        # Headers and footers are usually repeated (first/even/default), keep each line once
+        for part in header_parts:
+            with package.open(part) as xml_file:
+                for line in _stream_wordml_lines(xml_file):
+                    if line not in seen_margin_lines:
+                        seen_margin_lines.add(line)
+                        lines.append(line)
+
+        with package.open('word/document.xml') as xml_file:
+            lines.extend(_stream_wordml_lines(xml_file))
+
+        for part in footer_parts:
+            with package.open(part) as xml_file:
+                for line in _stream_wordml_lines(xml_file):
+                    if line not in seen_margin_lines:
+                        seen_margin_lines.add(line)
+                        lines.append(line)
+
+    return clean_extracted_text('\n'.join(lines))
+
+def _stream_wordml_lines(xml_file):
+    """Yield text lines from a WordprocessingML part using iterparse"""
+
+    paragraph_stack = []  # text fragments for each open paragraph (text boxes nest)
+    row_stack = []        # cell texts for each open table row
+    cell_stack = []       # [paragraph texts, is_merge_continuation] for each open cell
+    container = None      # element whose children are cleared to bound memory
+    fallback_depth = 0    # inside mc:Fallback, which duplicates mc:Choice content
+
+    for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+        tag = elem.tag
+
+        if event == 'start':
+            if tag == MC_NS + 'Fallback':
+                fallback_depth += 1
+            elif fallback_depth:
+                continue
+            elif tag == W_NS + 'p':
+                paragraph_stack.append([])
+            elif tag == W_NS + 'tr':
+                row_stack.append([])
+            elif tag == W_NS + 'tc':
+                cell_stack.append([[], False])
+            elif tag in (W_NS + 'body', W_NS + 'hdr', W_NS + 'ftr'):
+                container = elem
+            continue
+
+        if tag == MC_NS + 'Fallback':
+            fallback_depth -= 1
+            elem.clear()
+            continue
+        if fallback_depth:
+            continue
+
+        if tag == W_NS + 't':
+            if paragraph_stack and elem.text:
+                paragraph_stack[-1].append(elem.text)
+        elif tag == W_NS + 'tab':
+            if paragraph_stack:
+                paragraph_stack[-1].append('\t')
+        elif tag in (W_NS + 'br', W_NS + 'cr'):
+            if paragraph_stack:
+                paragraph_stack[-1].append('\n')
+        elif tag == W_NS + 'vMerge':
+            # Only the cell that restarts a vertical merge carries the content
+            if cell_stack and elem.get(W_NS + 'val', 'continue') != 'restart':
+                cell_stack[-1][1] = True
+        elif tag == W_NS + 'p':
+            paragraph_text = ''.join(paragraph_stack.pop())
+            if cell_stack:
+                cell_stack[-1][0].append(paragraph_text)
+            elif paragraph_text.strip():
+                yield paragraph_text
+        elif tag == W_NS + 'tc':
+            paragraphs, is_continuation = cell_stack.pop()
+            cell_text = '\n'.join(paragraphs)
+            if row_stack and not is_continuation and cell_text.strip():
+                row_stack[-1].append(cell_text)
+        elif tag == W_NS + 'tr':
+            row_text = ' '.join(row_stack.pop())
+            if cell_stack:
+                # Nested table: the row belongs to the enclosing cell
+                cell_stack[-1][0].append(row_text)
+            elif row_text.strip():
+                yield row_text
+
+        if tag in (W_NS + 'p', W_NS + 'tbl') and not paragraph_stack and not cell_stack:
+            if container is not None:
+                container.clear()
+
 def clean_extracted_text(text: str) -> str:
     """Clean and normalize extracted text"""
 
@@ -103,6 +502,213 @@ def clean_extracted_text(text: str) -> str:
 
     return cleaned_text.strip()
 
+def segment_resume_sections(text: str) -> list:
+    """
+    Find standard section headings in cleaned resume text.
+
+    Returns one entry per detected section, in document order, with the
+    character offsets of the heading and of the section body.
+    """
+
+    sections = []
+    seen = set()
+    offset = 0
+
+    for line in text.split('\n'):
+        line_start = offset
+        offset += len(line) + 1
+        stripped = line.strip()
+
+        if not stripped:
+            continue
+
+        for section, pattern in SECTION_HEADING_PATTERNS.items():
+            match = None if section in seen else pattern.match(stripped)
+            if not match:
+                continue
+            # Bare headings are short; long lines only count with an inline ":" separator
+            if len(stripped) > SECTION_HEADING_MAX_LENGTH and ':' not in stripped:
+                continue
+
+            if match.group('inline'):
+                content_start = line_start + line.find(stripped) + match.start('inline')
+            else:
+                content_start = min(offset, len(text))
+
+            seen.add(section)
+            sections.append({
+                'name': section,
+                'heading': stripped,
+                'start': line_start,
+                'content_start': content_start
+            })
+            break
+
+    for index, section in enumerate(sections):
+        next_start = sections[index + 1]['start'] if index + 1 < len(sections) else len(text)
+        section['end'] = next_start
+
+    return sections
+
+def detect_layout_issues(text: str, sections: list) -> list:
+    """Flag ATS problems that are visible in the extracted text layout"""
+
+    issues = []
+    lines = [line for line in text.split('\n') if line.strip()]
+    word_count = len(text.split())
+
+    if not sections:
+        issues.append("No standard section headings detected")
+
+    if lines and len(lines) >= LAYOUT_MIN_LINES:
+        avg_line_length = sum(len(line) for line in lines) / len(lines)
+        if avg_line_length < LAYOUT_SHORT_LINE_LENGTH:
+            issues.append("Fragmented text lines suggest a multi-column or table layout")
+
+    if any(ch in NON_STANDARD_BULLETS or unicodedata.category(ch) == 'Co' for ch in text):
+        issues.append("Non-standard bullet symbols or icon fonts detected")
+
+    contact = extract_basic_info(text)
+    if not contact['emails']:
+        issues.append("No email address found in parsed text")
+    if not contact['phones']:
+        issues.append("No phone number found in parsed text")
+
+    if word_count < RESUME_MIN_WORDS:
+        issues.append("Very little text extracted; content may be in images or graphics")
+    elif word_count > RESUME_MAX_WORDS:
+        issues.append("Resume is longer than two pages of text")
+
+    return issues
+
+def analyze_resume_structure(text: str) -> dict:
+    """Compute section layout, missing sections and layout-based ATS issues locally"""
+
+    sections = segment_resume_sections(text)
+    found = {section['name'] for section in sections}
+
+    return {
+        'sections': sections,
+        'missing_sections': [name for name in RESUME_SECTION_HEADINGS if name not in found],
+        'ats_issues': detect_layout_issues(text, sections)
+    }
+
+def _parse_date_token(token: str, is_end: bool = False) -> Optional[int]:
+    """
+    Convert a date token to a month index (year * 12 + month - 1).
+
+    An end token naming a month is inclusive, so it maps to the following
+    month: "Jan 2019 - Dec 2019" covers 12 months and back-to-back jobs merge.
+    """
+
+    token = token.strip().lower()
+
+    if token in ('present', 'current', 'now', 'today', 'date'):
+        now = datetime.now()
+        return now.year * 12 + now.month - 1
+
+    if '/' in token:
+        month, year = token.split('/')
+        month, year = int(month), int(year)
+        if not 1 <= month <= 12:
+            return None
+    elif token[:1].isdigit():
+        # A bare year ends at its start so "2018 - 2020" counts as two years
+        year, month = int(token), 1
+        is_end = False
+    else:
+        month = MONTH_NUMBERS.get(token[:4].rstrip('.,'), MONTH_NUMBERS.get(token[:3]))
+        year = int(re.search(r'\d{4}', token).group())
+
+    if not EARLIEST_CAREER_YEAR <= year <= datetime.now().year + 1:
+        return None
+    return year * 12 + month - 1 + (1 if is_end else 0)
+
+def extract_employment_ranges(text: str) -> list:
+    """Find employment date ranges as (start, end) month indexes"""
+
+    ranges = []
+    for match in DATE_RANGE_PATTERN.finditer(text):
+        start = _parse_date_token(match.group('start'))
+        end = _parse_date_token(match.group('end'), is_end=True)
+        if start is not None and end is not None and start <= end:
+            ranges.append((start, end))
+    return ranges
+
+def merge_month_ranges(ranges: list) -> int:
+    """Merge overlapping ranges and return the total number of months covered"""
+
+    total = 0
+    current_start = current_end = None
+
+    for start, end in sorted(ranges):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+def find_degree_levels(text: str) -> list:
+    """Return every degree level mentioned in the text, highest first"""
+
+    text = DEGREE_FALSE_POSITIVES.sub(' ', text)
+    return [name for name, _, pattern in DEGREE_LEVELS if pattern.search(text)]
+
+def extract_education_level(text: str) -> Optional[str]:
+    """Return the highest degree level mentioned in the text"""
+
+    levels = find_degree_levels(text)
+    return levels[0] if levels else None
+
+def get_degree_rank(degree: Optional[str]) -> int:
+    """Rank a degree level name (0 when unknown)"""
+
+    for name, rank, _ in DEGREE_LEVELS:
+        if name == degree:
+            return rank
+    return 0
+
+@lru_cache(maxsize=256)
+def extract_candidate_history(text: str) -> tuple:
+    """
+    Return (total_years, highest_degree) parsed from cleaned resume text.
+
+    Date ranges are read from the Experience section when one is found,
+    otherwise from everything outside the Education section.
+    """
+
+    sections = {section['name']: section for section in segment_resume_sections(text)}
+
+    if 'Experience' in sections:
+        experience = sections['Experience']
+        experience_text = text[experience['content_start']:experience['end']]
+    elif 'Education' in sections:
+        education = sections['Education']
+        experience_text = text[:education['start']] + '\n' + text[education['end']:]
+    else:
+        experience_text = text
+
+    months = merge_month_ranges(extract_employment_ranges(experience_text))
+    if months:
+        years = round(months / 12, 1)
+    else:
+        stated = STATED_YEARS_PATTERN.search(text)
+        years = float(stated.group(1)) if stated else None
+
+    # Only scan the whole resume when it has no Education section to read
+    if 'Education' in sections:
+        education = sections['Education']
+        degree = extract_education_level(text[education['start']:education['end']])
+    else:
+        degree = extract_education_level(text)
+
+    return years, degree
+
 def extract_basic_info(text: str) -> dict:
     """Extract basic information using simple patterns"""
 
@@ -122,7 +728,8 @@ def extract_basic_info(text: str) -> dict:
     phone_patterns = [
         r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',  # 123-456-7890 or 123.456.7890
         r'\(\d{3}\)\s?\d{3}[-.]?\d{4}',    # (123) 456-7890
-        r'\b\d{10}\b'                         # 1234567890
+        r'\b\d{10}\b',                        # 1234567890
+        r'\+\d{1,3}(?:[\s.-]?\(?\d{2,5}\)?){2,4}'  # +91 98765 43210, +44 20 7946 0958
     ]
 
     for pattern in phone_patterns:
@@ -159,9 +766,15 @@ def extract_text_from_pdf_alternative(pdf_path: str) -> str:
                 if page_text:
                     text += page_text + "\n"
 
-        return clean_extracted_text(text)
+        return text
 
     except ImportError:
         raise Exception("pdfplumber not installed. Using PyPDF2 fallback.")
     except Exception as e:
         raise Exception(f"Alternative PDF extraction failed: {str(e)}")
+
+register_pdf_backend('pypdf2', extract_text_from_pdf_pypdf2)
+
+# pdfplumber is optional; without it there is nothing to escalate to
+if importlib.util.find_spec('pdfplumber') is not None:
+    register_pdf_backend('pdfplumber', extract_text_from_pdf_alternative)
@@ -1,4 +1,6 @@
 import os
+import re
+import zipfile
 from datetime import datetime
 import json
 from reportlab.lib.pagesizes import letter
@@ -6,21 +8,127 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
+from resume_parser import find_degree_levels
+
+# Pre-flight upload limits
+MAX_RESUME_PAGES = 10
+MAX_DOCX_UNCOMPRESSED_SIZE = 50 * 1024 * 1024  # guards against zip bombs
+PDF_PROBE_BYTES = 64 * 1024  # head/tail window scanned for the trailer and page tree
+PDF_COUNT_PATTERN = re.compile(rb'/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b')
+PDF_LINEARIZED_PAGES_PATTERN = re.compile(rb'/Linearized\b[^>]*?/N\s+(\d+)')
+DOCX_PAGES_PATTERN = re.compile(rb'<Pages>(\d+)</Pages>')
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'  # encrypted OOXML is wrapped in an OLE container
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
     ALLOWED_EXTENSIONS = {'pdf', 'docx'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def validate_file_size(file):
-    """Validate file size (max 16MB)"""
-    MAX_SIZE = 16 * 1024 * 1024  # 16MB
+def validate_file_size(file, max_size=16 * 1024 * 1024):
+    """Validate file size (max 16MB by default)"""
     file.seek(0, os.SEEK_END)
     size = file.tell()
     file.seek(0)  # Reset file pointer
-    return size <= MAX_SIZE
+    return size <= max_size
+
+def preflight_check_file(file, filename, max_size=16 * 1024 * 1024):
+    """
+    Cheaply reject bad uploads before full parsing.
+
+    Only the magic bytes, the PDF head/tail (trailer and page tree) or the
+    DOCX zip central directory are read. Returns an error message, or None
+    when the file looks acceptable. The file position is reset afterwards.
+    """
+
+    try:
+        if not validate_file_size(file, max_size):
+            return f"File is too large. Maximum size is {max_size // (1024 * 1024)}MB."
+
+        extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+        header = file.read(8)
+        file.seek(0)
 
-def generate_pdf_report(analysis_data):
+        if extension == 'pdf':
+            return _preflight_pdf(file, header)
+        if extension == 'docx':
+            return _preflight_docx(file, header)
+        return "File type not allowed. Please upload PDF or DOCX files only."
+
+    except Exception as e:
+        print(f"Pre-flight check error: {str(e)}")
+        return "The file appears to be corrupted and could not be read."
+    finally:
+        file.seek(0)
+
+def _preflight_pdf(file, header):
+    """Check PDF magic bytes, trailer, encryption and page count"""
+
+    if not header.startswith(b'%PDF-'):
+        return "File content does not match its .pdf extension."
+
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    head = file.read(PDF_PROBE_BYTES)
+    file.seek(max(0, size - PDF_PROBE_BYTES))
+    tail = file.read()
+
+    if b'%%EOF' not in tail[-2048:] or b'startxref' not in tail:
+        return "The PDF appears to be truncated or corrupted."
+
+    # The trailer (or xref stream dictionary) references /Encrypt for protected files
+    if b'/Encrypt' in tail:
+        return "Password-protected PDFs are not supported. Please upload an unprotected file."
+
+    page_count = None
+    linearized = PDF_LINEARIZED_PAGES_PATTERN.search(head)
+    if linearized:
+        page_count = int(linearized.group(1))
+    else:
+        # The root page tree carries the largest /Count
+        counts = [int(a or b) for a, b in PDF_COUNT_PATTERN.findall(head + tail)]
+        if counts:
+            page_count = max(counts)
+
+    if page_count is not None and page_count > MAX_RESUME_PAGES:
+        return f"The PDF has {page_count} pages. Resumes are limited to {MAX_RESUME_PAGES} pages."
+
+    return None
+
+def _preflight_docx(file, header):
+    """Check DOCX magic bytes and the zip central directory"""
+
+    if header.startswith(OLE_MAGIC):
+        return "Password-protected DOCX files are not supported. Please upload an unprotected file."
+    if not header.startswith(b'PK\x03\x04'):
+        return "File content does not match its .docx extension."
+
+    try:
+        package = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        return "The DOCX file appears to be corrupted."
+
+    with package:
+        entries = {info.filename: info for info in package.infolist()}
+
+        if 'word/document.xml' not in entries:
+            return "The file is not a valid Word document."
+        if any(info.flag_bits & 0x1 for info in entries.values()):
+            return "Password-protected DOCX files are not supported. Please upload an unprotected file."
+        if sum(info.file_size for info in entries.values()) > MAX_DOCX_UNCOMPRESSED_SIZE:
+            return "The DOCX file is too large to process."
+
+        # docProps/app.xml is a few hundred bytes and records the page count Word last saw
+        app_props = entries.get('docProps/app.xml')
+        if app_props is not None and app_props.file_size <= 64 * 1024:
+            pages = DOCX_PAGES_PATTERN.search(package.read(app_props))
+            page_count = int(pages.group(1)) if pages else 0
+            if page_count > MAX_RESUME_PAGES:
+                return f"The document has {page_count} pages. Resumes are limited to {MAX_RESUME_PAGES} pages."
+
+    return None
+
+def generate_pdf_report(analysis_data, report_id=None):
     """Generate PDF report from analysis data"""
 
     try:
@@ -28,9 +136,12 @@ def generate_pdf_report(analysis_data):
         reports_dir = "reports"
         os.makedirs(reports_dir, exist_ok=True)
 
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"resume_analysis_report_{timestamp}.pdf"
+        # Stored analyses get a stable filename so the report can be reused
+        if report_id:
+            filename = f"resume_analysis_report_{report_id}.pdf"
+        else:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"resume_analysis_report_{timestamp}.pdf"
         filepath = os.path.join(reports_dir, filename)
 
         # Create PDF document
@@ -218,12 +329,10 @@ def extract_job_requirements(job_description):
         requirements['experience_years'] = int(exp_match.group(1))
 
     # Extract education requirements
-    if 'bachelor' in job_lower or 'bs' in job_lower:
-        requirements['education'] = 'Bachelor\'s degree'
-    elif 'master' in job_lower or 'ms' in job_lower:
-        requirements['education'] = 'Master\'s degree'
-    elif 'phd' in job_lower or 'doctorate' in job_lower:
-        requirements['education'] = 'PhD/Doctorate'
+    # The lowest degree listed is the minimum ("BS/MS in Computer Science" -> Bachelor's)
+    degree_levels = find_degree_levels(job_description)
+    if degree_levels:
+        requirements['education'] = degree_levels[-1]
 
     return requirements
 
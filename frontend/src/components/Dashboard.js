@@ -13,11 +13,16 @@ const Dashboard = ({ analysisResult, onReset }) => {
   const handleExportReport = async () => {
     setIsExporting(true);
     try {
-      const response = await axios.post('/export-report', {
-        analysis: analysisResult
-      }, {
-        responseType: 'blob'
-      });
+      // Stored analyses are exported by id so the server can reuse its cached report
+      const response = analysisResult.analysis_id
+        ? await axios.get(`/export-report/${analysisResult.analysis_id}`, {
+            responseType: 'blob'
+          })
+        : await axios.post('/export-report', {
+            analysis: analysisResult
+          }, {
+            responseType: 'blob'
+          });
 
       // Create download link
       const blob = new Blob([response.data], { type: 'application/pdf' });
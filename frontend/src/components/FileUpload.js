@@ -61,7 +61,7 @@ const FileUpload = ({ onAnalysisComplete, onAnalysisError, isLoading, setIsLoadi
       });
 
       if (response.data.success) {
-        onAnalysisComplete(response.data.analysis);
+        onAnalysisComplete({ ...response.data.analysis, analysis_id: response.data.analysis_id });
       } else {
         onAnalysisError(response.data.error || 'Analysis failed');
       }